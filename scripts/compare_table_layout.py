@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Compare BigQuery bytes scanned for the titanic table with and without the
+clustered / range partitioned layout used by the data loader.
+
+The titanic table is replicated into a synthetic scaled-up dataset twice: once
+unpartitioned and unclustered, once clustered (and integer-range partitioned on
+passengerid). The same filter queries are then run against both tables with the
+query cache disabled and the bytes processed by each are reported.
+
+Usage:
+    python scripts/compare_table_layout.py --project-id your-project-id --scale 20000
+
+Note: the queries are really executed (dry runs do not account for clustering
+pruning), so this incurs on-demand query and storage costs proportional to
+--scale. The synthetic tables are deleted afterwards unless --keep is given.
+"""
+
+import argparse
+import os
+
+from google.cloud import bigquery
+
+CLUSTERING_FIELDS = ["survived", "pclass", "sex", "embarked"]
+
+# Typical agent predicates on the clustering / partitioning columns
+COMPARISON_QUERIES = {
+    "filter_pclass": "SELECT COUNT(*) AS n, AVG(SAFE_CAST(fare AS FLOAT64)) AS avg_fare FROM `{table}` WHERE pclass = '1'",
+    "filter_sex_survived": "SELECT COUNT(*) AS n, AVG(SAFE_CAST(age AS FLOAT64)) AS avg_age FROM `{table}` WHERE sex = 'female' AND survived = '1'",
+    "filter_embarked": "SELECT COUNT(*) AS n FROM `{table}` WHERE embarked = 'Q'",
+    "filter_passengerid_range": "SELECT COUNT(*) AS n, AVG(SAFE_CAST(fare AS FLOAT64)) AS avg_fare FROM `{table}` WHERE passengerid BETWEEN 1 AND {passenger_limit}",
+}
+
+
+def build_synthetic_table(client, source, destination, scale, layout):
+    """Create a scaled-up copy of the source table, optionally with the clustered/partitioned layout."""
+    # Each copy gets its own block of 1000 PassengerIds so ids stay unique
+    max_passenger_id = scale * 1000
+    layout_sql = ""
+    if layout:
+        layout_sql = (
+            f"PARTITION BY RANGE_BUCKET(passengerid, GENERATE_ARRAY(0, {max_passenger_id}, {max(max_passenger_id // 100, 1)}))\n"
+            f"CLUSTER BY {', '.join(CLUSTERING_FIELDS)}\n"
+        )
+    query = f"""
+    CREATE OR REPLACE TABLE `{destination}`
+    {layout_sql}AS
+    SELECT * REPLACE (CAST(passengerid AS INT64) + copy * 1000 AS passengerid)
+    FROM `{source}`
+    CROSS JOIN UNNEST(GENERATE_ARRAY(0, {scale - 1})) AS copy
+    """
+    client.query(query).result()
+    table = client.get_table(destination)
+    print(f"Created {destination}: {table.num_rows} rows, {table.num_bytes / 1024 ** 2:.1f} MiB")
+
+
+def bytes_processed(client, query):
+    """Run a query without the cache and return the bytes it processed."""
+    job_config = bigquery.QueryJobConfig(use_query_cache=False)
+    job = client.query(query, job_config=job_config)
+    job.result()
+    return job.total_bytes_processed or 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--project-id", default=os.getenv("GOOGLE_CLOUD_PROJECT", "agentic-data-science-460701"))
+    parser.add_argument("--dataset", default="test_dataset")
+    parser.add_argument("--table", default="titanic")
+    parser.add_argument("--scale", type=int, default=20000, help="Number of copies of the titanic table")
+    parser.add_argument("--keep", action="store_true", help="Keep the synthetic tables after the comparison")
+    args = parser.parse_args()
+
+    client = bigquery.Client(project=args.project_id)
+    source = f"{args.project_id}.{args.dataset}.{args.table}"
+    plain_table = f"{source}_scaled_plain"
+    layout_table = f"{source}_scaled_layout"
+
+    try:
+        build_synthetic_table(client, source, plain_table, args.scale, layout=False)
+        build_synthetic_table(client, source, layout_table, args.scale, layout=True)
+
+        print()
+        print(f"{'query':<28}{'plain MiB':>14}{'layout MiB':>14}{'saved':>10}")
+        print("-" * 66)
+        # Roughly the first 10% of the synthetic PassengerIds
+        passenger_limit = args.scale * 100
+        for name, template in COMPARISON_QUERIES.items():
+            plain = bytes_processed(client, template.format(table=plain_table, passenger_limit=passenger_limit))
+            layout = bytes_processed(client, template.format(table=layout_table, passenger_limit=passenger_limit))
+            saved = 1 - layout / plain if plain else 0
+            print(f"{name:<28}{plain / 1024 ** 2:>14.1f}{layout / 1024 ** 2:>14.1f}{saved:>10.0%}")
+    finally:
+        if not args.keep:
+            client.delete_table(plain_table, not_found_ok=True)
+            client.delete_table(layout_table, not_found_ok=True)
+
+
+if __name__ == "__main__":
+    main()
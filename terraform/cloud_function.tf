@@ -28,6 +28,13 @@ resource "google_cloudfunctions2_function" "titanic_data_loader" {
       PROJECT_ID = var.project_id
       DATASET_ID = "test_dataset"
       TABLE_ID   = "titanic"
+
+      # Table layout used by the loader (see variables.tf)
+      CLUSTERING_FIELDS  = join(",", var.titanic_clustering_fields)
+      PARTITION_FIELD    = var.titanic_partition_field
+      PARTITION_START    = tostring(var.titanic_partition_range.start)
+      PARTITION_END      = tostring(var.titanic_partition_range.end)
+      PARTITION_INTERVAL = tostring(var.titanic_partition_range.interval)
     }
   }
 
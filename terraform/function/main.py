@@ -3,6 +3,7 @@ import os
 import logging
 from google.cloud import bigquery
 from google.cloud import storage
+from google.cloud.exceptions import NotFound
 import pandas as pd
 import io
 
@@ -10,6 +11,55 @@ import io
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+def get_table_layout(columns):
+    """
+    Build the clustering and integer-range partitioning spec for the table
+    from environment variables, keeping only columns present in the CSV.
+    """
+    clustering_fields = [
+        field.strip().lower()
+        for field in os.environ.get('CLUSTERING_FIELDS', 'survived,pclass,sex,embarked').split(',')
+        if field.strip()
+    ]
+    unknown_fields = [field for field in clustering_fields if field not in columns]
+    if unknown_fields:
+        logger.warning(f"Ignoring unknown clustering fields: {unknown_fields}")
+    # BigQuery allows at most four clustering columns
+    clustering_fields = [field for field in clustering_fields if field in columns][:4]
+
+    range_partitioning = None
+    partition_field = os.environ.get('PARTITION_FIELD', '').strip().lower()
+    if partition_field:
+        if partition_field in columns:
+            range_partitioning = bigquery.RangePartitioning(
+                field=partition_field,
+                range_=bigquery.PartitionRange(
+                    start=int(os.environ.get('PARTITION_START', '0')),
+                    end=int(os.environ.get('PARTITION_END', '1000')),
+                    interval=int(os.environ.get('PARTITION_INTERVAL', '100')),
+                ),
+            )
+        else:
+            logger.warning(f"Ignoring unknown partition field: {partition_field}")
+
+    return clustering_fields or None, range_partitioning
+
+
+def layout_matches(table, clustering_fields, range_partitioning):
+    """Check whether an existing table already has the requested layout."""
+    if (table.clustering_fields or None) != clustering_fields:
+        return False
+    existing = table.range_partitioning
+    if existing is None or range_partitioning is None:
+        return existing is None and range_partitioning is None
+    return (
+        existing.field == range_partitioning.field
+        and existing.range_.start == range_partitioning.range_.start
+        and existing.range_.end == range_partitioning.range_.end
+        and existing.range_.interval == range_partitioning.range_.interval
+    )
+
 @functions_framework.cloud_event
 def load_titanic_to_bigquery(cloud_event):
     """
@@ -65,12 +115,36 @@ def load_titanic_to_bigquery(cloud_event):
         # Get dataset and table references
         dataset_ref = bigquery_client.dataset(dataset_id)
         table_ref = dataset_ref.table(table_id)
+        
+        # Resolve clustering / partitioning layout for the table
+        clustering_fields, range_partitioning = get_table_layout(list(df.columns))
+        partition_field = range_partitioning.field if range_partitioning else None
+        logger.info(f"Table layout: clustering={clustering_fields}, partitioning={partition_field}")
+        
+        # Write integers (not 1.0 floats) so the INTEGER partition column loads
+        if partition_field:
+            df[partition_field] = pd.to_numeric(df[partition_field]).astype("Int64")
+        
+        # WRITE_TRUNCATE keeps the existing layout, so a changed layout is loaded
+        # into a staging table first and only swapped in once the load succeeded
+        try:
+            existing_table = bigquery_client.get_table(table_ref)
+            recreate = not layout_matches(existing_table, clustering_fields, range_partitioning)
+        except NotFound:
+            recreate = False
+        load_ref = dataset_ref.table(f"{table_id}_staging") if recreate else table_ref
+        if recreate:
+            logger.info(f"Table layout changed, loading into staging table {dataset_id}.{load_ref.table_id}")
+            bigquery_client.delete_table(load_ref, not_found_ok=True)
           # Configure the load job
         job_config = bigquery.LoadJobConfig(
-            # Create schema from DataFrame columns
+            # Create schema from DataFrame columns; range partitioning requires an INTEGER column
             schema=[
-                bigquery.SchemaField(col, "STRING") for col in df.columns
+                bigquery.SchemaField(col, "INTEGER" if col == partition_field else "STRING")
+                for col in df.columns
             ],
+            clustering_fields=clustering_fields,
+            range_partitioning=range_partitioning,
             # Overwrite the table if it exists
             write_disposition=bigquery.WriteDisposition.WRITE_TRUNCATE,
             # Skip header row since we're defining schema manually
@@ -84,16 +158,35 @@ def load_titanic_to_bigquery(cloud_event):
         csv_buffer.seek(0)
         
         # Load data into BigQuery
-        logger.info(f"Loading data into {project_id}.{dataset_id}.{table_id}")
+        logger.info(f"Loading data into {project_id}.{dataset_id}.{load_ref.table_id}")
         load_job = bigquery_client.load_table_from_file(
             csv_buffer,
-            table_ref,
+            load_ref,
             job_config=job_config
         )
         
         # Wait for the job to complete
         load_job.result()
         
+        # Replace the old table with the staged one; the copy keeps the new layout
+        if recreate:
+            logger.info(f"Replacing {dataset_id}.{table_id} with {dataset_id}.{load_ref.table_id}")
+            try:
+                bigquery_client.delete_table(table_ref, not_found_ok=True)
+                bigquery_client.copy_table(load_ref, table_ref).result()
+            except Exception as e:
+                # The loaded data is kept in the staging table so it can be copied in manually
+                logger.error(
+                    f"Failed to replace {dataset_id}.{table_id}: {str(e)}. "
+                    f"Loaded data is still in {project_id}.{dataset_id}.{load_ref.table_id}"
+                )
+                return {
+                    'status': 'error',
+                    'message': f'Failed to replace {project_id}.{dataset_id}.{table_id}: {str(e)}',
+                    'staging_table': f'{project_id}.{dataset_id}.{load_ref.table_id}'
+                }
+            bigquery_client.delete_table(load_ref, not_found_ok=True)
+        
         # Get the loaded table
         table = bigquery_client.get_table(table_ref)
         
@@ -107,7 +200,9 @@ def load_titanic_to_bigquery(cloud_event):
             'status': 'success',
             'message': f'Successfully loaded {table.num_rows} rows into {project_id}.{dataset_id}.{table_id}',
             'rows_loaded': table.num_rows,
-            'columns': len(table.schema)
+            'columns': len(table.schema),
+            'clustering_fields': table.clustering_fields,
+            'partition_field': table.range_partitioning.field if table.range_partitioning else None
         }
         
     except Exception as e:
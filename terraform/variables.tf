@@ -47,4 +47,30 @@ variable "bq_location" {
   description = "BigQuery dataset location"
   type        = string
   default     = "US"
+}
+
+variable "titanic_clustering_fields" {
+  description = "Columns the Cloud Function clusters the titanic table by (max 4, in filter-frequency order)"
+  type        = list(string)
+  default     = ["survived", "pclass", "sex", "embarked"]
+}
+
+variable "titanic_partition_field" {
+  description = "Integer column for range partitioning of the titanic table (empty to disable)"
+  type        = string
+  default     = ""
+}
+
+variable "titanic_partition_range" {
+  description = "Integer range partitioning bounds for titanic_partition_field"
+  type = object({
+    start    = number
+    end      = number
+    interval = number
+  })
+  default = {
+    start    = 0
+    end      = 1000
+    interval = 100
+  }
 }
\ No newline at end of file
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Tests for the BigQuery agent's batch query tool using a mocked BigQuery client
+"""
+
+import sys
+import os
+from unittest import mock
+
+import pandas as pd
+
+# Add the titanic-agent directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'titanic-agent'))
+
+from titanic_agent.sub_agents.bigquery import agent as bigquery_agent_module
+from titanic_agent.sub_agents.bigquery.agent import (
+    MAX_BATCH_QUERIES,
+    _qualify_table_name,
+    execute_queries,
+)
+
+
+def _mock_client(query_handler):
+    """Patch bigquery.Client so client.query() is answered by query_handler."""
+    client = mock.Mock()
+    client.query.side_effect = query_handler
+    return mock.patch.object(bigquery_agent_module.bigquery, "Client", return_value=client)
+
+
+def _job(df=None, error=None):
+    """Build a fake query job whose result() yields df or raises error."""
+    job = mock.Mock()
+    if error is not None:
+        job.result.side_effect = error
+    else:
+        job.result.return_value.to_dataframe.return_value = df
+    return job
+
+
+def test_qualify_table_name_is_case_insensitive():
+    """Bare table names are qualified regardless of FROM casing"""
+    assert _qualify_table_name("select count(*) from titanic", "proj") == (
+        "select count(*) from `proj.test_dataset.titanic`"
+    )
+    assert _qualify_table_name("SELECT * FROM titanic WHERE Sex = 'male'", "proj") == (
+        "SELECT * FROM `proj.test_dataset.titanic` WHERE Sex = 'male'"
+    )
+    assert _qualify_table_name("SELECT * FROM other.titanic", "proj") == "SELECT * FROM other.titanic"
+    assert _qualify_table_name("SELECT 1", "proj") == "SELECT 1"
+
+
+def test_qualify_table_name_handles_table_names_inside_keywords():
+    """Only the table name is replaced, even when it also appears in FROM"""
+    assert _qualify_table_name("SELECT * FROM M", "p") == "SELECT * FROM `p.test_dataset.M`"
+    assert _qualify_table_name("select * from o where x = 1", "p") == (
+        "select * from `p.test_dataset.o` where x = 1"
+    )
+
+
+def test_execute_queries_preserves_order_and_isolates_errors():
+    """Each query gets its own entry in submission order; one failure does not hide the others"""
+    def handler(query):
+        if "bad_column" in query:
+            return _job(error=RuntimeError("Unrecognized name: bad_column"))
+        if "Pclass" in query:
+            return _job(pd.DataFrame({"Pclass": ["1", "2", "3"]}))
+        return _job(pd.DataFrame({"total": [891]}))
+
+    queries = [
+        "select count(*) as total from titanic",
+        "SELECT bad_column FROM titanic",
+        "SELECT DISTINCT Pclass FROM titanic",
+    ]
+    with _mock_client(handler) as client_class:
+        result = execute_queries(queries)
+
+    client = client_class.return_value
+    assert client.query.call_count == 3
+    assert result["success"] is False
+    assert result["queries_executed"] == 3
+    first, second, third = result["results"]
+    assert first["success"] is True
+    assert first["data"] == [{"total": 891}]
+    assert "`" in first["query_executed"]
+    assert second["success"] is False
+    assert "bad_column" in second["error"]
+    assert third["success"] is True
+    assert third["rows_returned"] == 3
+
+
+def test_execute_queries_submits_all_jobs_before_waiting():
+    """Every job is submitted before the first result is awaited"""
+    events = []
+
+    def handler(query):
+        events.append("submit")
+        job = _job(pd.DataFrame({"n": [1]}))
+        job.result.side_effect = lambda: events.append("wait") or mock.DEFAULT
+        return job
+
+    with _mock_client(handler):
+        result = execute_queries(["SELECT 1", "SELECT 2"])
+
+    assert result["success"] is True
+    assert events == ["submit", "submit", "wait", "wait"]
+
+
+def test_execute_queries_rejects_empty_and_oversized_batches():
+    """Empty batches and batches above the cap fail without starting any job"""
+    with _mock_client(lambda query: _job(pd.DataFrame())) as client_class:
+        empty = execute_queries([])
+        too_many = execute_queries(["SELECT 1"] * (MAX_BATCH_QUERIES + 1))
+
+    assert empty["success"] is False
+    assert "No queries" in empty["error"]
+    assert too_many["success"] is False
+    assert str(MAX_BATCH_QUERIES) in too_many["error"]
+    client_class.return_value.query.assert_not_called()
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Tests for the bounded session service and the local file artifact service
+"""
+
+import asyncio
+import sys
+import os
+import time
+from unittest import mock
+
+import pytest
+
+from google.genai import types
+from google.adk.events import Event, EventActions
+from google.adk.sessions import InMemorySessionService
+from google.adk.sessions.sqlite_session_service import SqliteSessionService
+
+# Add the titanic-agent directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'titanic-agent'))
+
+from titanic_agent.session_store import (
+    APP_NAME,
+    BoundedSessionService,
+    LocalFileArtifactService,
+    create_session_service,
+)
+
+USER_ID = "analyst"
+
+
+def _event(text):
+    """Build a user event carrying a state delta."""
+    return Event(
+        author="user",
+        invocation_id="invocation",
+        content=types.Content(role="user", parts=[types.Part(text=text)]),
+        actions=EventActions(state_delta={"last_question": text}),
+    )
+
+
+async def _create(service, session_id):
+    return await service.create_session(app_name=APP_NAME, user_id=USER_ID, session_id=session_id)
+
+
+async def _exists(service, session_id):
+    session = await service.get_session(app_name=APP_NAME, user_id=USER_ID, session_id=session_id)
+    return session is not None
+
+
+def test_lru_eviction_keeps_most_recently_used_sessions():
+    """Beyond max_sessions the least recently used session is evicted"""
+    async def run():
+        backend = InMemorySessionService()
+        service = BoundedSessionService(backend, max_sessions=2)
+        await _create(service, "s1")
+        await _create(service, "s2")
+        # Touch s1 so s2 becomes the least recently used
+        await service.get_session(app_name=APP_NAME, user_id=USER_ID, session_id="s1")
+        await _create(service, "s3")
+
+        assert await _exists(backend, "s1")
+        assert not await _exists(backend, "s2")
+        assert await _exists(backend, "s3")
+        assert service.get_metrics()["evicted_sessions"] == 1
+
+    asyncio.run(run())
+
+
+def test_idle_sessions_are_evicted():
+    """Sessions idle longer than the timeout are deleted on the next operation"""
+    async def run():
+        backend = InMemorySessionService()
+        service = BoundedSessionService(backend, idle_timeout_seconds=0.2)
+        await _create(service, "idle")
+        time.sleep(0.3)
+        await _create(service, "active")
+
+        assert not await _exists(backend, "idle")
+        assert await _exists(backend, "active")
+        assert service.get_metrics()["resident_sessions"] == 1
+
+    asyncio.run(run())
+
+
+def test_eviction_keeps_user_scoped_artifacts(tmp_path):
+    """Evicting a session deletes its own artifacts but not the user's"""
+    async def run():
+        artifacts = LocalFileArtifactService(str(tmp_path))
+        service = BoundedSessionService(InMemorySessionService(), artifact_service=artifacts, max_sessions=1)
+        await _create(service, "s1")
+        chart = types.Part(inline_data=types.Blob(data=b"\x89PNG", mime_type="image/png"))
+        await artifacts.save_artifact(
+            app_name=APP_NAME, user_id=USER_ID, session_id="s1", filename="chart.png", artifact=chart
+        )
+        await artifacts.save_artifact(
+            app_name=APP_NAME, user_id=USER_ID, session_id="s1", filename="user:profile.txt",
+            artifact=types.Part(text="prefers bar charts")
+        )
+        await artifacts.save_artifact(
+            app_name=APP_NAME, user_id=USER_ID, filename="notes.txt", artifact=types.Part(text="user scoped")
+        )
+        assert await artifacts.list_artifact_keys(app_name=APP_NAME, user_id=USER_ID, session_id="s1") == [
+            "chart.png", "notes.txt", "user:profile.txt"
+        ]
+
+        await _create(service, "s2")
+
+        assert await artifacts.list_artifact_keys(app_name=APP_NAME, user_id=USER_ID, session_id="s1") == [
+            "notes.txt", "user:profile.txt"
+        ]
+        profile = await artifacts.load_artifact(
+            app_name=APP_NAME, user_id=USER_ID, session_id="s2", filename="user:profile.txt"
+        )
+        assert profile.text == "prefers bar charts"
+
+    asyncio.run(run())
+
+
+def test_file_artifact_versions_round_trip(tmp_path):
+    """Saved versions load back byte for byte with their metadata, across instances"""
+    async def run():
+        artifacts = LocalFileArtifactService(str(tmp_path))
+        key = dict(app_name=APP_NAME, user_id=USER_ID, session_id="s1", filename="survival.png")
+        first = types.Part(inline_data=types.Blob(data=b"v0-bytes", mime_type="image/png"))
+        second = types.Part(inline_data=types.Blob(data=b"v1-bytes", mime_type="image/png"))
+        assert await artifacts.save_artifact(artifact=first, **key) == 0
+        assert await artifacts.save_artifact(artifact=second, custom_metadata={"chart": "bar"}, **key) == 1
+
+        reopened = LocalFileArtifactService(str(tmp_path))
+        assert (await reopened.load_artifact(**key)).inline_data.data == b"v1-bytes"
+        assert (await reopened.load_artifact(version=0, **key)).inline_data.data == b"v0-bytes"
+        assert await reopened.load_artifact(version=5, **key) is None
+        assert await reopened.list_versions(**key) == [0, 1]
+
+        versions = await reopened.list_artifact_versions(**key)
+        assert [version.version for version in versions] == [0, 1]
+        latest = await reopened.get_artifact_version(**key)
+        assert latest.version == 1
+        assert latest.mime_type == "image/png"
+        assert latest.custom_metadata == {"chart": "bar"}
+        assert latest.canonical_uri.startswith("file://")
+
+        await reopened.delete_artifact(**key)
+        assert await reopened.load_artifact(**key) is None
+        assert await reopened.get_artifact_version(**key) is None
+
+    asyncio.run(run())
+
+
+def test_metrics_track_sessions_bytes_and_evictions():
+    """get_metrics reports resident sessions, growing bytes and eviction counts"""
+    async def run():
+        service = BoundedSessionService(InMemorySessionService(), max_sessions=2)
+        session = await _create(service, "s1")
+        empty_bytes = service.get_metrics()["resident_bytes"]
+        await service.append_event(session, _event("How many passengers survived?"))
+        metrics = service.get_metrics()
+        assert metrics["resident_sessions"] == 1
+        assert metrics["resident_bytes"] > empty_bytes
+
+        await _create(service, "s2")
+        await _create(service, "s3")
+        metrics = service.get_metrics()
+        assert metrics["resident_sessions"] == 2
+        assert metrics["evicted_sessions"] == 1
+        assert metrics["resident_bytes"] <= 2 * empty_bytes
+
+        await service.delete_session(app_name=APP_NAME, user_id=USER_ID, session_id="s2")
+        await service.delete_session(app_name=APP_NAME, user_id=USER_ID, session_id="s3")
+        assert service.get_metrics()["resident_sessions"] == 0
+        assert service.get_metrics()["resident_bytes"] == 0
+
+    asyncio.run(run())
+
+
+def test_sessions_stored_before_restart_are_restored_and_evicted(tmp_path):
+    """Sessions already in SQLite count towards metrics and the cap after a restart"""
+    db_path = str(tmp_path / "sessions.db")
+
+    async def run():
+        before = BoundedSessionService(SqliteSessionService(db_path=db_path))
+        for session_id in ("s1", "s2", "s3"):
+            session = await _create(before, session_id)
+            await before.append_event(session, _event(f"question for {session_id}"))
+            time.sleep(0.05)
+
+        after = BoundedSessionService(SqliteSessionService(db_path=db_path), max_sessions=2)
+        await after.restore_sessions(APP_NAME)
+        metrics = after.get_metrics()
+        assert metrics["resident_sessions"] == 2
+        assert metrics["evicted_sessions"] == 1
+        assert metrics["resident_bytes"] > 0
+
+        backend = SqliteSessionService(db_path=db_path)
+        assert not await _exists(backend, "s1")
+        assert await _exists(backend, "s2")
+        assert await _exists(backend, "s3")
+
+    asyncio.run(run())
+
+
+def test_non_abstract_methods_are_delegated():
+    """flush, get_user_state and backend-specific methods reach the backend"""
+    async def run():
+        backend = InMemorySessionService()
+        service = BoundedSessionService(backend)
+        await service.create_session(app_name=APP_NAME, user_id=USER_ID, state={"user:theme": "dark"})
+        assert await service.get_user_state(app_name=APP_NAME, user_id=USER_ID) == {"theme": "dark"}
+
+        with mock.patch.object(backend, "flush", new=mock.AsyncMock()) as flush:
+            await service.flush()
+        flush.assert_awaited_once()
+        assert service.create_session_sync == backend.create_session_sync
+
+    asyncio.run(run())
+
+
+def test_artifact_paths_cannot_escape_their_directory(tmp_path):
+    """Dot-segment names are rejected instead of touching other scopes or the root"""
+    async def run():
+        root = tmp_path / "artifacts"
+        artifacts = LocalFileArtifactService(str(root))
+        text = types.Part(text="survival summary")
+        await artifacts.save_artifact(
+            app_name=APP_NAME, user_id=USER_ID, session_id="s1", filename="keep.txt", artifact=text
+        )
+        await artifacts.save_artifact(app_name=APP_NAME, user_id=USER_ID, filename="notes", artifact=text)
+        outside = tmp_path / "outside.txt"
+        outside.write_text("untouched")
+
+        for filename in ("", ".", ".."):
+            with pytest.raises(ValueError):
+                await artifacts.delete_artifact(
+                    app_name=APP_NAME, user_id=USER_ID, session_id="s1", filename=filename
+                )
+            with pytest.raises(ValueError):
+                await artifacts.save_artifact(
+                    app_name=APP_NAME, user_id=USER_ID, session_id="s1", filename=filename, artifact=text
+                )
+            with pytest.raises(ValueError):
+                await artifacts.load_artifact(
+                    app_name=APP_NAME, user_id=USER_ID, session_id="s1", filename=filename
+                )
+        for bad in (dict(user_id=".."), dict(app_name=".."), dict(session_id="..")):
+            key = dict(app_name=APP_NAME, user_id=USER_ID, session_id="s1", filename="keep.txt")
+            key.update(bad)
+            with pytest.raises(ValueError):
+                await artifacts.delete_artifact(**key)
+
+        # A slash in a name is encoded into a single path component
+        await artifacts.save_artifact(
+            app_name=APP_NAME, user_id=USER_ID, session_id="s1", filename="../../outside.txt", artifact=text
+        )
+        assert outside.read_text() == "untouched"
+        assert await artifacts.list_artifact_keys(app_name=APP_NAME, user_id=USER_ID, session_id="s1") == [
+            "../../outside.txt", "keep.txt", "notes"
+        ]
+
+    asyncio.run(run())
+
+
+def test_session_cap_is_only_default_for_in_memory_store(tmp_path, monkeypatch):
+    """Persistent stores rely on the idle timeout unless a cap is set explicitly"""
+    monkeypatch.delenv("SESSION_MAX_COUNT", raising=False)
+    sqlite_uri = "sqlite:///" + str(tmp_path / "sessions.db")
+    assert create_session_service("memory").get_metrics()["max_sessions"] == 1000
+    assert create_session_service(sqlite_uri).get_metrics()["max_sessions"] is None
+
+    monkeypatch.setenv("SESSION_MAX_COUNT", "5")
+    assert create_session_service(sqlite_uri).get_metrics()["max_sessions"] == 5
+
+
+def test_uncapped_store_keeps_all_active_sessions(tmp_path):
+    """Without a cap, active sessions are never deleted from a persistent store"""
+    db_path = str(tmp_path / "sessions.db")
+
+    async def run():
+        service = BoundedSessionService(SqliteSessionService(db_path=db_path))
+        for index in range(5):
+            await _create(service, f"s{index}")
+
+        backend = SqliteSessionService(db_path=db_path)
+        for index in range(5):
+            assert await _exists(backend, f"s{index}")
+        assert service.get_metrics()["evicted_sessions"] == 0
+
+    asyncio.run(run())
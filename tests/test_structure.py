@@ -28,7 +28,11 @@ def test_imports():
         from titanic_agent.tools import call_bigquery_agent, call_analytics_agent
         print("   ✅ Tools imported successfully")
         
-        print("4. Validating agent configuration...")
+        print("4. Testing session store import...")
+        from titanic_agent.session_store import BoundedSessionService, LocalFileArtifactService, create_runner
+        print("   ✅ Session store imported successfully")
+        
+        print("5. Validating agent configuration...")
         print(f"   Root agent model: {root_agent.model}")
         print(f"   Root agent tools: {len(root_agent.tools)} tools")
         print(f"   BigQuery agent model: {bigquery_agent.model}")
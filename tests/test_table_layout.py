@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Tests for the loader's clustering / partitioning layout and its exposure through get_table_schema
+"""
+
+import importlib.util
+import sys
+import os
+from datetime import datetime, timezone
+from unittest import mock
+
+from google.cloud import bigquery
+
+# Add the titanic-agent directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'titanic-agent'))
+
+from titanic_agent.sub_agents.bigquery import agent as bigquery_agent_module
+from titanic_agent.sub_agents.bigquery.agent import get_table_schema
+
+# The Cloud Function source is a standalone main.py, load it under its own name
+_spec = importlib.util.spec_from_file_location(
+    "titanic_loader",
+    os.path.join(os.path.dirname(__file__), '..', 'terraform', 'function', 'main.py'),
+)
+loader = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(loader)
+
+COLUMNS = ["passengerid", "survived", "pclass", "name", "sex", "age", "embarked", "fare"]
+
+
+def _clear_layout_env(monkeypatch):
+    for name in ("CLUSTERING_FIELDS", "PARTITION_FIELD", "PARTITION_START", "PARTITION_END", "PARTITION_INTERVAL"):
+        monkeypatch.delenv(name, raising=False)
+
+
+def _range_partitioning(field="passengerid", start=0, end=1000, interval=100):
+    return bigquery.RangePartitioning(
+        field=field, range_=bigquery.PartitionRange(start=start, end=end, interval=interval)
+    )
+
+
+def test_default_layout_clusters_without_partitioning(monkeypatch):
+    """Defaults cluster on the common filter columns and leave partitioning off"""
+    _clear_layout_env(monkeypatch)
+    clustering_fields, range_partitioning = loader.get_table_layout(COLUMNS)
+    assert clustering_fields == ["survived", "pclass", "sex", "embarked"]
+    assert range_partitioning is None
+
+
+def test_layout_env_vars_are_parsed(monkeypatch):
+    """Clustering list is normalized and PARTITION_* builds an integer range"""
+    _clear_layout_env(monkeypatch)
+    monkeypatch.setenv("CLUSTERING_FIELDS", " Sex , PCLASS,,")
+    monkeypatch.setenv("PARTITION_FIELD", "PassengerId")
+    monkeypatch.setenv("PARTITION_START", "1")
+    monkeypatch.setenv("PARTITION_END", "901")
+    monkeypatch.setenv("PARTITION_INTERVAL", "50")
+    clustering_fields, range_partitioning = loader.get_table_layout(COLUMNS)
+    assert clustering_fields == ["sex", "pclass"]
+    assert range_partitioning.field == "passengerid"
+    assert (range_partitioning.range_.start, range_partitioning.range_.end, range_partitioning.range_.interval) == (1, 901, 50)
+
+
+def test_unknown_fields_are_dropped_and_clustering_capped(monkeypatch):
+    """Unknown columns are ignored and at most four clustering columns are kept"""
+    _clear_layout_env(monkeypatch)
+    monkeypatch.setenv("CLUSTERING_FIELDS", "cabin,survived,pclass,sex,embarked,fare")
+    monkeypatch.setenv("PARTITION_FIELD", "ticket")
+    clustering_fields, range_partitioning = loader.get_table_layout(COLUMNS)
+    assert clustering_fields == ["survived", "pclass", "sex", "embarked"]
+    assert range_partitioning is None
+
+    monkeypatch.setenv("CLUSTERING_FIELDS", "cabin")
+    clustering_fields, _ = loader.get_table_layout(COLUMNS)
+    assert clustering_fields is None
+
+
+def test_layout_matches_identical_layouts():
+    """An existing table with the requested layout is loaded in place"""
+    table = mock.Mock(clustering_fields=["survived", "pclass"], range_partitioning=_range_partitioning())
+    assert loader.layout_matches(table, ["survived", "pclass"], _range_partitioning())
+
+    plain = mock.Mock(clustering_fields=None, range_partitioning=None)
+    assert loader.layout_matches(plain, None, None)
+
+
+def test_layout_mismatches_trigger_recreate():
+    """Any clustering or partitioning difference means the table is staged and swapped"""
+    table = mock.Mock(clustering_fields=["survived", "pclass"], range_partitioning=_range_partitioning())
+    assert not loader.layout_matches(table, ["pclass", "survived"], _range_partitioning())
+    assert not loader.layout_matches(table, None, _range_partitioning())
+    assert not loader.layout_matches(table, ["survived", "pclass"], None)
+    assert not loader.layout_matches(table, ["survived", "pclass"], _range_partitioning(field="age"))
+    assert not loader.layout_matches(table, ["survived", "pclass"], _range_partitioning(interval=10))
+
+    plain = mock.Mock(clustering_fields=None, range_partitioning=None)
+    assert not loader.layout_matches(plain, ["survived"], None)
+    assert not loader.layout_matches(plain, None, _range_partitioning())
+
+
+def test_failed_swap_reports_staging_table(monkeypatch):
+    """If the staged copy cannot replace the live table, the staging table is reported"""
+    _clear_layout_env(monkeypatch)
+    monkeypatch.setenv("PROJECT_ID", "proj")
+    csv = "PassengerId,Survived,Pclass,Sex,Embarked\n1,0,3,male,S\n2,1,1,female,C\n"
+    with mock.patch.object(loader.storage, "Client") as storage_client, \
+            mock.patch.object(loader.bigquery, "Client") as bigquery_client:
+        storage_client.return_value.bucket.return_value.blob.return_value.download_as_text.return_value = csv
+        client = bigquery_client.return_value
+        client.dataset.side_effect = lambda dataset_id: bigquery.DatasetReference("proj", dataset_id)
+        client.get_table.return_value = mock.Mock(clustering_fields=None, range_partitioning=None)
+        client.copy_table.side_effect = RuntimeError("copy quota exceeded")
+        event = mock.Mock(data={"bucket": "bucket", "name": "titanic.csv"})
+
+        result = loader.load_titanic_to_bigquery(event)
+
+    assert result["status"] == "error"
+    assert "copy quota exceeded" in result["message"]
+    assert result["staging_table"] == "proj.test_dataset.titanic_staging"
+    loaded_into = client.load_table_from_file.call_args[0][1]
+    assert loaded_into.table_id == "titanic_staging"
+    deleted = [call[0][0].table_id for call in client.delete_table.call_args_list]
+    assert "titanic_staging" not in deleted[1:]
+
+
+def test_get_table_schema_reports_layout():
+    """get_table_schema surfaces clustering and partitioning from the table"""
+    table = mock.Mock()
+    table.schema = [
+        bigquery.SchemaField("passengerid", "INTEGER"),
+        bigquery.SchemaField("pclass", "STRING"),
+    ]
+    table.num_rows = 891
+    table.num_bytes = 61194
+    table.clustering_fields = ["survived", "pclass", "sex", "embarked"]
+    table.range_partitioning = _range_partitioning()
+    table.time_partitioning = None
+    table.created = table.modified = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+    with mock.patch.object(bigquery_agent_module.bigquery, "Client") as client_class:
+        client_class.return_value.get_table.return_value = table
+        result = get_table_schema()
+
+    assert result["success"] is True
+    assert result["clustering_fields"] == ["survived", "pclass", "sex", "embarked"]
+    assert result["range_partitioning"] == {"field": "passengerid", "start": 0, "end": 1000, "interval": 100}
+    assert result["time_partitioning"] is None
+    assert result["num_bytes"] == 61194
+    assert result["schema"][0] == {
+        "name": "passengerid", "type": "INTEGER", "mode": "NULLABLE", "description": "No description"
+    }
+
+
+def test_get_table_schema_reports_unpartitioned_table():
+    """An unclustered, unpartitioned table reports empty layout fields"""
+    table = mock.Mock(schema=[], num_rows=0, num_bytes=0, clustering_fields=None,
+                      range_partitioning=None, time_partitioning=None, created=None, modified=None)
+    with mock.patch.object(bigquery_agent_module.bigquery, "Client") as client_class:
+        client_class.return_value.get_table.return_value = table
+        result = get_table_schema()
+
+    assert result["success"] is True
+    assert result["clustering_fields"] is None
+    assert result["range_partitioning"] is None
+    assert result["time_partitioning"] is None
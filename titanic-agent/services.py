@@ -0,0 +1,44 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Registers the titanic:// session and artifact services with the ADK CLI.
+
+`adk web`, `adk api_server` and `adk deploy` load this file from the agents
+directory. Passing --session_service_uri=titanic:// and
+--artifact_service_uri=titanic:// serves the agent with the bounded, persistent
+stores from titanic_agent.session_store instead of the in-memory defaults.
+"""
+
+from google.adk.cli.service_registry import get_service_registry
+
+from titanic_agent.session_store import create_artifact_service, create_session_service
+
+_artifact_service = None
+
+
+def _titanic_artifact_factory(uri: str, **kwargs):
+    # Shared with the session service so evicted sessions drop their artifacts
+    global _artifact_service
+    if _artifact_service is None:
+        _artifact_service = create_artifact_service()
+    return _artifact_service
+
+
+def _titanic_session_factory(uri: str, **kwargs):
+    return create_session_service(artifact_service=_titanic_artifact_factory(uri))
+
+
+get_service_registry().register_session_service("titanic", _titanic_session_factory)
+get_service_registry().register_artifact_service("titanic", _titanic_artifact_factory)
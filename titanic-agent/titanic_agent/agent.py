@@ -31,14 +31,14 @@ date_today = date.today()
 def setup_before_agent_call(callback_context: CallbackContext):
     """Setup the agent with database and schema context."""
     
-    # Setting up database settings in session state
-    if "database_settings" not in callback_context.state:
+    # Setting up database settings once in app-scoped state, shared by all sessions
+    if "app:all_db_settings" not in callback_context.state:
         db_settings = dict()
         db_settings["use_database"] = "BigQuery"
         db_settings["project_id"] = "agentic-data-science-460701"
         db_settings["dataset"] = "test_dataset"
         db_settings["table"] = "titanic"
-        callback_context.state["all_db_settings"] = db_settings
+        callback_context.state["app:all_db_settings"] = db_settings
 
     # Add schema information to instruction
     schema_info = """
@@ -59,9 +59,10 @@ def setup_before_agent_call(callback_context: CallbackContext):
     Table location: `agentic-data-science-460701.test_dataset.titanic`
     """
     
-    callback_context._invocation_context.agent.instruction = (
-        callback_context._invocation_context.agent.instruction + schema_info
-    )
+    # Only append once, the agent instance is shared across invocations
+    agent = callback_context._invocation_context.agent
+    if schema_info not in agent.instruction:
+        agent.instruction = agent.instruction + schema_info
 
 
 root_agent = Agent(
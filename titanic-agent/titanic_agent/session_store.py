@@ -0,0 +1,558 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Bounded, persistent session and artifact stores for long-running deployments."""
+
+import json
+import os
+import shutil
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
+from urllib.parse import quote, unquote, urlparse
+
+from google.genai import types
+from google.adk.artifacts import BaseArtifactService, InMemoryArtifactService
+from google.adk.artifacts.base_artifact_service import ArtifactVersion, ensure_part
+from google.adk.events import Event
+from google.adk.runners import Runner
+from google.adk.sessions import BaseSessionService, InMemorySessionService, Session
+from google.adk.sessions.base_session_service import (
+    GetSessionConfig,
+    ListSessionsResponse,
+)
+
+APP_NAME = "titanic_agent"
+
+
+def _state_size(state: Dict[str, Any]) -> int:
+    """Size in bytes of the compact JSON encoding of a state dict."""
+    return len(json.dumps(state, separators=(",", ":"), default=str))
+
+
+def _event_size(event: Event) -> int:
+    """Size in bytes of the compact JSON encoding of an event."""
+    return len(event.model_dump_json(exclude_none=True))
+
+
+def _session_size(session: Session) -> int:
+    """Approximate serialized size of a session's state and events."""
+    return _state_size(session.state) + sum(_event_size(event) for event in session.events)
+
+
+class BoundedSessionService(BaseSessionService):
+    """
+    Session service wrapper that expires idle sessions and optionally caps the session count.
+
+    Every call is delegated to the backend service (SQLite, database or in-memory).
+    Sessions idle for longer than idle_timeout_seconds are deleted from the backend
+    together with their session-scoped artifacts. When max_sessions is set, the
+    least recently used sessions beyond it are deleted as well; since that drops
+    stored history, create_session_service only enables the cap by default for
+    the in-memory backend. Sessions already stored in the backend are restored
+    from their last update time the first time an app is used, so eviction and
+    metrics also cover sessions written before a restart.
+    """
+
+    def __init__(
+        self,
+        backend: BaseSessionService,
+        artifact_service: Optional[BaseArtifactService] = None,
+        idle_timeout_seconds: float = 24 * 60 * 60,
+        max_sessions: Optional[int] = None,
+    ):
+        self._backend = backend
+        self._artifact_service = artifact_service
+        self._idle_timeout_seconds = idle_timeout_seconds
+        self._max_sessions = max_sessions
+        # (app_name, user_id, session_id) -> (last access time, approx bytes),
+        # least recently used first
+        self._sessions: "OrderedDict[Tuple[str, str, str], Tuple[float, int]]" = OrderedDict()
+        self._restored_apps: Set[str] = set()
+        self._resident_bytes = 0
+        self._evicted_sessions = 0
+
+    def __getattr__(self, name: str) -> Any:
+        # Backend-specific extras (e.g. close, prepare_tables) pass straight through
+        if name == "_backend":
+            raise AttributeError(name)
+        return getattr(self._backend, name)
+
+    def _track(self, session: Session, size: int) -> None:
+        """Record an access to a session with its new approximate size."""
+        key = (session.app_name, session.user_id, session.id)
+        _, previous_size = self._sessions.pop(key, (0.0, 0))
+        self._sessions[key] = (time.time(), size)
+        self._resident_bytes += size - previous_size
+
+    def _untrack(self, key: Tuple[str, str, str]) -> None:
+        """Stop tracking a session."""
+        _, size = self._sessions.pop(key, (0.0, 0))
+        self._resident_bytes -= size
+
+    async def restore_sessions(self, app_name: str) -> None:
+        """
+        Start tracking sessions already stored in the backend for an app.
+
+        Runs once per app; sessions past the idle timeout or the session cap (if any) are
+        evicted immediately and the remaining ones are loaded to measure their size.
+        """
+        if app_name in self._restored_apps:
+            return
+        self._restored_apps.add(app_name)
+
+        response = await self._backend.list_sessions(app_name=app_name)
+        restored = [
+            ((session.app_name, session.user_id, session.id), session.last_update_time)
+            for session in response.sessions
+            if (session.app_name, session.user_id, session.id) not in self._sessions
+        ]
+        entries = list(self._sessions.items()) + [(key, (last_update, 0)) for key, last_update in restored]
+        self._sessions = OrderedDict(sorted(entries, key=lambda entry: entry[1][0]))
+        await self.evict_idle_sessions()
+
+        for key, _ in restored:
+            if key not in self._sessions:
+                continue
+            app, user_id, session_id = key
+            session = await self._backend.get_session(
+                app_name=app, user_id=user_id, session_id=session_id
+            )
+            if session is None:
+                self._untrack(key)
+                continue
+            last_access, _ = self._sessions[key]
+            size = _session_size(session)
+            self._sessions[key] = (last_access, size)
+            self._resident_bytes += size
+
+    async def create_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        state: Optional[Dict[str, Any]] = None,
+        session_id: Optional[str] = None,
+    ) -> Session:
+        await self.restore_sessions(app_name)
+        session = await self._backend.create_session(
+            app_name=app_name, user_id=user_id, state=state, session_id=session_id
+        )
+        self._track(session, _session_size(session))
+        await self.evict_idle_sessions()
+        return session
+
+    async def get_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        config: Optional[GetSessionConfig] = None,
+    ) -> Optional[Session]:
+        await self.restore_sessions(app_name)
+        session = await self._backend.get_session(
+            app_name=app_name, user_id=user_id, session_id=session_id, config=config
+        )
+        if session is not None:
+            key = (app_name, user_id, session_id)
+            if config is None or key not in self._sessions:
+                size = _session_size(session)
+            else:
+                # A filtered read does not see every event, keep the known size
+                size = self._sessions[key][1]
+            self._track(session, size)
+        return session
+
+    async def list_sessions(
+        self, *, app_name: str, user_id: Optional[str] = None
+    ) -> ListSessionsResponse:
+        await self.restore_sessions(app_name)
+        return await self._backend.list_sessions(app_name=app_name, user_id=user_id)
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        await self._backend.delete_session(
+            app_name=app_name, user_id=user_id, session_id=session_id
+        )
+        self._untrack((app_name, user_id, session_id))
+
+    async def get_user_state(self, *, app_name: str, user_id: str) -> Dict[str, Any]:
+        return await self._backend.get_user_state(app_name=app_name, user_id=user_id)
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        await self.restore_sessions(session.app_name)
+        event = await self._backend.append_event(session, event)
+        if event.partial:
+            # Partial (streaming) events are not stored
+            return event
+        key = (session.app_name, session.user_id, session.id)
+        if key in self._sessions:
+            size = self._sessions[key][1] + _event_size(event)
+        else:
+            size = _session_size(session)
+        self._track(session, size)
+        await self.evict_idle_sessions()
+        return event
+
+    async def flush(self) -> None:
+        await self._backend.flush()
+
+    async def evict_idle_sessions(self) -> int:
+        """
+        Delete sessions that are idle or, when a cap is set, beyond it.
+
+        Returns:
+            Number of sessions evicted
+        """
+        cutoff = time.time() - self._idle_timeout_seconds
+        evicted = 0
+        while self._sessions:
+            key, (last_access, _) = next(iter(self._sessions.items()))
+            over_cap = self._max_sessions is not None and len(self._sessions) > self._max_sessions
+            if last_access >= cutoff and not over_cap:
+                break
+            self._untrack(key)
+            await self._evict(*key)
+            evicted += 1
+        self._evicted_sessions += evicted
+        return evicted
+
+    async def _evict(self, app_name: str, user_id: str, session_id: str) -> None:
+        """Delete a session and its session-scoped artifacts from the backends."""
+        await self._backend.delete_session(
+            app_name=app_name, user_id=user_id, session_id=session_id
+        )
+        if self._artifact_service is None:
+            return
+        filenames = await self._artifact_service.list_artifact_keys(
+            app_name=app_name, user_id=user_id, session_id=session_id
+        )
+        for filename in filenames:
+            # User-scoped artifacts outlive individual sessions
+            if filename.startswith("user:"):
+                continue
+            await self._artifact_service.delete_artifact(
+                app_name=app_name, user_id=user_id, session_id=session_id, filename=filename
+            )
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Get resident session metrics.
+
+        Returns:
+            Dictionary containing resident session count, approximate bytes and evictions
+        """
+        return {
+            "resident_sessions": len(self._sessions),
+            "resident_bytes": self._resident_bytes,
+            "evicted_sessions": self._evicted_sessions,
+            "max_sessions": self._max_sessions,
+            "idle_timeout_seconds": self._idle_timeout_seconds,
+        }
+
+
+class LocalFileArtifactService(BaseArtifactService):
+    """
+    Artifact service that keeps artifact versions on the local filesystem.
+
+    Binary artifacts are written as raw bytes next to a small JSON metadata file
+    (rather than base64 inside JSON), so artifacts take no resident memory and
+    survive restarts. Artifacts named "user:..." or saved without a session_id
+    are user-scoped and shared by all of the user's sessions.
+    """
+
+    def __init__(self, root_dir: str):
+        self._root = Path(root_dir)
+        self._root.mkdir(parents=True, exist_ok=True)
+
+    def _segment(self, value: str, name: str) -> str:
+        """Encode one path component, rejecting names that would leave its directory."""
+        segment = quote(value, safe="")
+        if segment in ("", ".", ".."):
+            raise ValueError(f"Invalid {name}: {value!r}")
+        return segment
+
+    def _contained(self, path: Path) -> Path:
+        """Ensure a path resolves inside the artifact root."""
+        if not path.resolve().is_relative_to(self._root.resolve()):
+            raise ValueError(f"Artifact path escapes the artifact root: {path}")
+        return path
+
+    def _user_dir(self, app_name: str, user_id: str) -> Path:
+        """Directory holding every artifact of a user."""
+        return self._contained(
+            self._root / self._segment(app_name, "app_name") / self._segment(user_id, "user_id")
+        )
+
+    def _artifact_dir(
+        self, app_name: str, user_id: str, filename: str, session_id: Optional[str]
+    ) -> Path:
+        """Directory holding every version of an artifact."""
+        if filename.startswith("user:") or session_id is None:
+            scope = "user"
+        else:
+            # Prefixed so a session can never share the user scope directory
+            scope = "session-" + self._segment(session_id, "session_id")
+        return self._contained(
+            self._user_dir(app_name, user_id) / scope / self._segment(filename, "filename")
+        )
+
+    def _versions(self, artifact_dir: Path) -> List[int]:
+        """Sorted versions stored in an artifact directory."""
+        if not artifact_dir.is_dir():
+            return []
+        return sorted(int(path.stem) for path in artifact_dir.glob("*.json"))
+
+    def _read_version(self, artifact_dir: Path, version: int) -> Dict[str, Any]:
+        """Read the metadata file of an artifact version."""
+        return json.loads((artifact_dir / f"{version}.json").read_text())
+
+    def _to_artifact_version(
+        self, artifact_dir: Path, version: int, metadata: Dict[str, Any]
+    ) -> ArtifactVersion:
+        """Build the ArtifactVersion describing a stored version."""
+        return ArtifactVersion(
+            version=version,
+            canonical_uri=(artifact_dir / f"{version}.json").resolve().as_uri(),
+            custom_metadata=metadata.get("custom_metadata", {}),
+            create_time=metadata["create_time"],
+            mime_type=metadata.get("mime_type"),
+        )
+
+    async def save_artifact(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        filename: str,
+        artifact: Union[types.Part, Dict[str, Any]],
+        session_id: Optional[str] = None,
+        custom_metadata: Optional[Dict[str, Any]] = None,
+    ) -> int:
+        artifact = ensure_part(artifact)
+        artifact_dir = self._artifact_dir(app_name, user_id, filename, session_id)
+        artifact_dir.mkdir(parents=True, exist_ok=True)
+        versions = self._versions(artifact_dir)
+        version = versions[-1] + 1 if versions else 0
+
+        metadata: Dict[str, Any] = {"create_time": time.time()}
+        if custom_metadata:
+            metadata["custom_metadata"] = custom_metadata
+        if artifact.inline_data is not None:
+            (artifact_dir / f"{version}.bin").write_bytes(artifact.inline_data.data or b"")
+            metadata["mime_type"] = artifact.inline_data.mime_type
+        elif artifact.text is not None:
+            metadata["mime_type"] = "text/plain"
+            metadata["text"] = artifact.text
+        elif artifact.file_data is not None:
+            metadata["mime_type"] = artifact.file_data.mime_type
+            metadata["file_uri"] = artifact.file_data.file_uri
+        else:
+            raise ValueError("Not supported artifact type.")
+        # Metadata is written last, so a version only exists once it is complete
+        (artifact_dir / f"{version}.json").write_text(
+            json.dumps(metadata, separators=(",", ":"))
+        )
+        return version
+
+    async def load_artifact(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        filename: str,
+        session_id: Optional[str] = None,
+        version: Optional[int] = None,
+    ) -> Optional[types.Part]:
+        artifact_dir = self._artifact_dir(app_name, user_id, filename, session_id)
+        versions = self._versions(artifact_dir)
+        if not versions:
+            return None
+        if version is None:
+            version = versions[-1]
+        elif version not in versions:
+            return None
+
+        metadata = self._read_version(artifact_dir, version)
+        if "text" in metadata:
+            return types.Part(text=metadata["text"])
+        if "file_uri" in metadata:
+            return types.Part(
+                file_data=types.FileData(
+                    file_uri=metadata["file_uri"], mime_type=metadata.get("mime_type")
+                )
+            )
+        return types.Part(
+            inline_data=types.Blob(
+                data=(artifact_dir / f"{version}.bin").read_bytes(),
+                mime_type=metadata.get("mime_type"),
+            )
+        )
+
+    async def list_artifact_keys(
+        self, *, app_name: str, user_id: str, session_id: Optional[str] = None
+    ) -> List[str]:
+        user_dir = self._user_dir(app_name, user_id)
+        scopes = ["user"]
+        if session_id is not None:
+            scopes.append("session-" + self._segment(session_id, "session_id"))
+        filenames = []
+        for scope in scopes:
+            scope_dir = user_dir / scope
+            if scope_dir.is_dir():
+                filenames.extend(unquote(path.name) for path in scope_dir.iterdir() if path.is_dir())
+        return sorted(filenames)
+
+    async def delete_artifact(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        filename: str,
+        session_id: Optional[str] = None,
+    ) -> None:
+        artifact_dir = self._artifact_dir(app_name, user_id, filename, session_id)
+        shutil.rmtree(artifact_dir, ignore_errors=True)
+
+    async def list_versions(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        filename: str,
+        session_id: Optional[str] = None,
+    ) -> List[int]:
+        return self._versions(self._artifact_dir(app_name, user_id, filename, session_id))
+
+    async def list_artifact_versions(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        filename: str,
+        session_id: Optional[str] = None,
+    ) -> List[ArtifactVersion]:
+        artifact_dir = self._artifact_dir(app_name, user_id, filename, session_id)
+        return [
+            self._to_artifact_version(artifact_dir, version, self._read_version(artifact_dir, version))
+            for version in self._versions(artifact_dir)
+        ]
+
+    async def get_artifact_version(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        filename: str,
+        session_id: Optional[str] = None,
+        version: Optional[int] = None,
+    ) -> Optional[ArtifactVersion]:
+        artifact_dir = self._artifact_dir(app_name, user_id, filename, session_id)
+        versions = self._versions(artifact_dir)
+        if not versions:
+            return None
+        if version is None:
+            version = versions[-1]
+        elif version not in versions:
+            return None
+        return self._to_artifact_version(artifact_dir, version, self._read_version(artifact_dir, version))
+
+
+def create_artifact_service(artifact_dir: Optional[str] = None) -> BaseArtifactService:
+    """
+    Create the artifact service.
+
+    Args:
+        artifact_dir: "memory" or a local directory, defaults to ARTIFACT_STORE_DIR
+            (default: titanic_artifacts)
+
+    Returns:
+        LocalFileArtifactService, or InMemoryArtifactService for "memory"
+    """
+    if artifact_dir is None:
+        artifact_dir = os.getenv("ARTIFACT_STORE_DIR", "titanic_artifacts")
+    if artifact_dir == "memory":
+        return InMemoryArtifactService()
+    return LocalFileArtifactService(artifact_dir)
+
+
+def create_session_service(
+    session_uri: Optional[str] = None,
+    artifact_service: Optional[BaseArtifactService] = None,
+) -> BoundedSessionService:
+    """
+    Create the bounded session service.
+
+    Configured through environment variables:
+        SESSION_STORE_URI: "memory", sqlite:///path or a database URL (default: sqlite:///titanic_sessions.db)
+        SESSION_IDLE_TIMEOUT_SECONDS: Idle time before a session is evicted (default: 86400)
+        SESSION_MAX_COUNT: Maximum number of sessions; the least recently used beyond it
+            are deleted (default: 1000 for "memory", unset for persistent stores, where
+            the idle timeout is the only retention policy)
+
+    Args:
+        session_uri: Overrides SESSION_STORE_URI
+        artifact_service: Artifact service whose session artifacts are evicted with the session
+
+    Returns:
+        BoundedSessionService exposing get_metrics()
+    """
+    if session_uri is None:
+        session_uri = os.getenv("SESSION_STORE_URI", "sqlite:///titanic_sessions.db")
+    scheme = urlparse(session_uri).scheme
+    max_sessions = os.getenv("SESSION_MAX_COUNT")
+    if session_uri == "memory" or scheme == "memory":
+        backend = InMemorySessionService()
+        # Only the in-memory backend needs a cap to keep memory flat
+        max_sessions = max_sessions or "1000"
+    elif scheme == "sqlite":
+        from google.adk.sessions.sqlite_session_service import SqliteSessionService
+        backend = SqliteSessionService(db_path=urlparse(session_uri).path[1:])
+    else:
+        # Other database URLs need the google-adk[db] extra (SQLAlchemy)
+        from google.adk.sessions import DatabaseSessionService
+        backend = DatabaseSessionService(db_url=session_uri)
+
+    return BoundedSessionService(
+        backend,
+        artifact_service=artifact_service,
+        idle_timeout_seconds=float(os.getenv("SESSION_IDLE_TIMEOUT_SECONDS", "86400")),
+        max_sessions=int(max_sessions) if max_sessions else None,
+    )
+
+
+def create_runner(agent=None) -> Runner:
+    """
+    Create a Runner backed by bounded, persistent session and artifact stores.
+
+    See create_session_service and create_artifact_service for configuration.
+
+    Args:
+        agent: Agent to run, defaults to the root Titanic agent
+
+    Returns:
+        Runner whose session_service exposes get_metrics()
+    """
+    if agent is None:
+        from .agent import root_agent
+        agent = root_agent
+
+    artifact_service = create_artifact_service()
+    return Runner(
+        app_name=APP_NAME,
+        agent=agent,
+        session_service=create_session_service(artifact_service=artifact_service),
+        artifact_service=artifact_service,
+    )
@@ -14,11 +14,52 @@
 
 """BigQuery sub-agent for Titanic data science operations."""
 
+import re
+
 from google.adk.agents import Agent
 from google.adk.tools import FunctionTool
 from google.cloud import bigquery
 import pandas as pd
-from typing import Any, Dict
+from typing import Any, Dict, List
+
+# Upper bound on concurrent jobs started by a single execute_queries call
+MAX_BATCH_QUERIES = 10
+
+# First bare (unqualified, unquoted) table name following FROM, in any case
+_BARE_TABLE_PATTERN = re.compile(r"\bFROM\s+([A-Za-z_][\w-]*)(?=[\s,;)]|$)", re.IGNORECASE)
+
+
+def _qualify_table_name(query: str, project_id: str) -> str:
+    """Qualify a bare table name after FROM with the project and dataset."""
+    match = _BARE_TABLE_PATTERN.search(query)
+    if match is None:
+        return query
+    return (
+        query[:match.start(1)]
+        + f"`{project_id}.test_dataset.{match.group(1)}`"
+        + query[match.end(1):]
+    )
+
+
+def _format_results(df: pd.DataFrame, query: str) -> Dict[str, Any]:
+    """Build the tool response for a query result DataFrame."""
+    # Limit output size for display
+    if len(df) > 100:
+        display_df = df.head(100)
+        truncated = True
+    else:
+        display_df = df
+        truncated = False
+    
+    return {
+        "success": True,
+        "rows_returned": len(df),
+        "rows_displayed": len(display_df),
+        "truncated": truncated,
+        "data": display_df.to_dict('records'),
+        "columns": list(df.columns),
+        "query_executed": query
+    }
 
 
 def execute_query(query: str) -> Dict[str, Any]:
@@ -36,19 +77,7 @@ def execute_query(query: str) -> Dict[str, Any]:
         client = bigquery.Client(project=project_id)
         
         # Add project and dataset context if not specified
-        if "FROM " in query.upper() and "." not in query.split("FROM")[1].split()[0]:
-            # Replace table name with fully qualified name
-            parts = query.split()
-            for i, part in enumerate(parts):
-                if part.upper() == "FROM" and i + 1 < len(parts):
-                    table_name = parts[i + 1].split()[0].strip(",();")
-                    if "." not in table_name:
-                        parts[i + 1] = parts[i + 1].replace(
-                            table_name, 
-                            f"`{project_id}.test_dataset.{table_name}`"
-                        )
-                    break
-            query = " ".join(parts)
+        query = _qualify_table_name(query, project_id)
         
         # Execute query
         job = client.query(query)
@@ -57,29 +86,84 @@ def execute_query(query: str) -> Dict[str, Any]:
         # Convert to pandas DataFrame for easier handling
         df = results.to_dataframe()
         
-        # Limit output size for display
-        if len(df) > 100:
-            display_df = df.head(100)
-            truncated = True
-        else:
-            display_df = df
-            truncated = False
+        return _format_results(df, query)
         
+    except Exception as e:
         return {
-            "success": True,
-            "rows_returned": len(df),
-            "rows_displayed": len(display_df),
-            "truncated": truncated,
-            "data": display_df.to_dict('records'),
-            "columns": list(df.columns),
+            "success": False,
+            "error": str(e),
             "query_executed": query
         }
+
+
+def execute_queries(queries: List[str]) -> Dict[str, Any]:
+    """
+    Execute several BigQuery SQL queries on the Titanic dataset in one call.
+    
+    All queries are submitted as concurrent jobs before any result is
+    awaited, so BigQuery schedules them in parallel. Use this instead of
+    repeated execute_query calls when several independent queries are needed.
+    
+    Args:
+        queries: List of SQL queries to execute (at most 10). Available table: titanic in test_dataset
+        
+    Returns:
+        Dictionary containing one result entry per query, in the same order
+    """
+    if not queries:
+        return {
+            "success": False,
+            "error": "No queries provided",
+            "queries": queries
+        }
+    if len(queries) > MAX_BATCH_QUERIES:
+        return {
+            "success": False,
+            "error": f"Too many queries: {len(queries)} provided, at most {MAX_BATCH_QUERIES} allowed per call",
+            "queries": queries
+        }
+    
+    try:
+        import os
+        project_id = os.getenv('GOOGLE_CLOUD_PROJECT', 'agentic-data-science-460701')
+        client = bigquery.Client(project=project_id)
+        
+        # Submit every job up front; client.query() does not block
+        submitted = []
+        for query in queries:
+            try:
+                query = _qualify_table_name(query, project_id)
+                submitted.append((query, client.query(query), None))
+            except Exception as e:
+                submitted.append((query, None, e))
+        
+        # Collect results in submission order
+        results = []
+        for query, job, error in submitted:
+            if error is None:
+                try:
+                    df = job.result().to_dataframe()
+                    results.append(_format_results(df, query))
+                    continue
+                except Exception as e:
+                    error = e
+            results.append({
+                "success": False,
+                "error": str(error),
+                "query_executed": query
+            })
+        
+        return {
+            "success": all(result["success"] for result in results),
+            "queries_executed": len(results),
+            "results": results
+        }
         
     except Exception as e:
         return {
             "success": False,
             "error": str(e),
-            "query_executed": query
+            "queries": queries
         }
 
 
@@ -88,7 +172,7 @@ def get_table_schema() -> Dict[str, Any]:
     Get the schema information for the Titanic dataset.
     
         Returns:
-        Dictionary containing table schema and metadata
+        Dictionary containing table schema, clustering/partitioning layout and metadata
     """
     try:
         import os
@@ -109,12 +193,32 @@ def get_table_schema() -> Dict[str, Any]:
                 "description": field.description or "No description"
             })
         
+        # Extract storage layout so queries can prune blocks and partitions
+        range_partitioning = None
+        if table.range_partitioning:
+            range_partitioning = {
+                "field": table.range_partitioning.field,
+                "start": table.range_partitioning.range_.start,
+                "end": table.range_partitioning.range_.end,
+                "interval": table.range_partitioning.range_.interval
+            }
+        time_partitioning = None
+        if table.time_partitioning:
+            time_partitioning = {
+                "field": table.time_partitioning.field,
+                "type": table.time_partitioning.type_
+            }
+        
         return {
             "success": True,
             "table_name": "titanic",
             "dataset": "test_dataset",
             "num_rows": table.num_rows,
+            "num_bytes": table.num_bytes,
             "schema": schema_info,
+            "clustering_fields": table.clustering_fields,
+            "range_partitioning": range_partitioning,
+            "time_partitioning": time_partitioning,
             "created": table.created.isoformat() if table.created else None,
             "modified": table.modified.isoformat() if table.modified else None
         }
@@ -158,9 +262,21 @@ You have access to the Titanic dataset in BigQuery with the following columns:
 - Embarked: Port of embarkation (C = Cherbourg, Q = Queenstown, S = Southampton)
 
 You can execute SQL queries, get schema information, and provide data insights.
+The table may be clustered and/or range partitioned; get_table_schema reports the
+clustering_fields and range_partitioning. Prefer direct equality or range predicates
+on those columns in WHERE clauses (e.g. WHERE Pclass = '1', not a function of Pclass)
+so BigQuery can prune the data it scans.
+Columns are loaded as STRING, so compare them with string literals, except the
+range_partitioning field (e.g. PassengerId), which is INTEGER and must be compared
+with integer literals (WHERE PassengerId BETWEEN 1 AND 100, not '1'). When unsure,
+check the column types returned by get_table_schema before writing predicates.
+When you need several independent queries (e.g. a count, a group-by and an average),
+send them together in a single execute_queries call (at most 10 per call) instead of
+calling execute_query once per query.
 Always provide clear, accurate responses about the dataset.""",
     tools=[
         FunctionTool(execute_query),
+        FunctionTool(execute_queries),
         FunctionTool(get_table_schema),
         FunctionTool(count_records),
     ],